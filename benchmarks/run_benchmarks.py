@@ -0,0 +1,411 @@
+"""Offline benchmark suite for the Dopamine Memecoin Sniper Bot.
+
+Drives the bot's own coroutines against pre-recorded synthetic DexScreener and
+Shyft responses (no network) and writes machine-readable results:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --tokens 5000 --baseline benchmarks/results/<previous>.json
+
+Metrics: tokens screened per second, profile-seen-to-buy latency,
+price-tick-to-sell-decision latency, poll-scheduler cost, memory with N open
+positions and backtest ticks per second.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="sniper-bench-"))
+os.makedirs(os.environ["DATA_DIR"], exist_ok=True)
+
+import dopamine_memecoin_sniper_bot as bot  # noqa: E402  (configures logging into DATA_DIR first)
+from mock_market import SyntheticMarket  # noqa: E402
+
+# configure_offline stubs these out of monitor_price; poll_schedule measures the real scheduler
+compute_poll_interval = bot.compute_poll_interval
+DATA_POLL_INTERVAL = bot.DATA_POLL_INTERVAL
+
+class RecordedResponse:
+    """Minimal stand-in for requests.Response over recorded bytes."""
+    __slots__ = ("status_code", "content")
+
+    def __init__(self, content, status_code=200):
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+class RecordedSession:
+    """Serves recorded payloads by URL in place of the bot's requests session."""
+
+    def __init__(self):
+        self.responses = {}
+        self.feeds = {}
+        self.served_at = {}
+        self.served = {}
+
+    def record(self, url, payload):
+        self.responses[url] = json.dumps(payload).encode()
+
+    def feed(self, url, payloads):
+        """Serves payloads in order on successive requests, repeating the last one."""
+        self.feeds[url] = [json.dumps(p).encode() for p in payloads]
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        feed = self.feeds.get(url)
+        if feed:
+            content = feed.pop(0) if len(feed) > 1 else feed[0]
+            self.served_at[url] = time.perf_counter()
+            self.served[url] = self.served.get(url, 0) + 1
+            return RecordedResponse(content)
+        content = self.responses.get(url)
+        if content is None:
+            return RecordedResponse(b'{"error": "not recorded"}', status_code=404)
+        return RecordedResponse(content)
+
+    def post(self, url, json=None, **kwargs):
+        return RecordedResponse(b'{"ok": true, "result": {}}')
+
+class RecordedPriceResponse:
+    """aiohttp-style response over a recorded payload, for the bot's price reads."""
+
+    def __init__(self, response):
+        self.status = response.status_code
+        self.content = response.content
+
+    async def read(self):
+        return self.content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class RecordedPriceSession:
+    """Stands in for the aiohttp session behind price_session()."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def get(self, url, params=None, **kwargs):
+        return RecordedPriceResponse(self.session.get(url, params=params))
+
+def reset_bot_state():
+    bot.api_cache.clear()
+    bot.active_positions.clear()
+    bot.price_history.clear()
+    bot.poll_intervals.clear()
+    bot.processed_tokens.clear()
+    bot.paper_trades = []
+    bot.loss_streak = 0
+    bot.current_buy_amount = bot.BUY_AMOUNT_MIN
+
+def configure_offline(session):
+    bot.session = session
+    bot.price_session = lambda: RecordedPriceSession(session)
+    bot.SHYFT_API_KEY = "bench"
+    bot.TELEGRAM_BOT_TOKEN = None  # Notifications short-circuit without touching the network
+    bot.DATA_POLL_INTERVAL = 0  # Never serve the monitor a cached tick
+    bot.compute_poll_interval = lambda token_address, current_price, stop=None: 0
+
+def record_market(session, tokens, pass_rate, seed):
+    """Records a profiles list plus pair and Shyft payloads for each synthetic token."""
+    market = SyntheticMarket(pass_rate=pass_rate, rug_rate=0, profile_batch=tokens, seed=seed)
+    now = time.time()
+    for _ in range(tokens):
+        market.add_token(now)
+    for mint in market.recent:
+        session.record(f"{bot.DEXSCREENER_PAIRS_API}/{mint}", market.pair(mint))
+        session.record(f"{bot.SHYFT_API}/{mint}", market.shyft(mint))
+    session.record(bot.DEXSCREENER_TOKEN_API, market.profiles())
+    return market
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"count": len(ordered), "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1], "mean": statistics.fmean(ordered)}
+
+async def bench_screening(args):
+    """Tokens screened per second through check_token, rug check included."""
+    session = RecordedSession()
+    configure_offline(session)
+    reset_bot_state()
+    market = record_market(session, args.tokens, args.pass_rate, args.seed)
+    mints = list(market.recent)
+    start = time.perf_counter()
+    passed = 0
+    for mint in mints:
+        market_cap, _, _ = await bot.check_token(mint)
+        passed += bool(market_cap)
+    elapsed = time.perf_counter() - start
+    return {"tokens": len(mints), "passed": passed, "seconds": elapsed, "tokens_per_second": len(mints) / elapsed}
+
+async def bench_profile_to_buy(args):
+    """Latency from the profiles list being decoded to each paper buy completing, through main()'s process_candidate."""
+    session = RecordedSession()
+    configure_offline(session)
+    reset_bot_state()
+    record_market(session, args.tokens, args.pass_rate, args.seed)
+    latencies = []
+    execute_trade, monitor_price, auto_paper = bot.execute_trade, bot.monitor_price, bot.auto_paper
+
+    async def timed_execute_trade(token_address, buy=True, paper=False):
+        success = await execute_trade(token_address, buy=buy, paper=paper)
+        if buy and success:
+            latencies.append((time.perf_counter() - seen_at) * 1000)
+        return success
+
+    async def idle_monitor(token_address, buy_price, market_cap, paper=False):
+        pass  # Exits are measured by tick_to_sell; stub monitors would spin on the zero poll interval
+
+    bot.execute_trade, bot.monitor_price, bot.auto_paper = timed_execute_trade, idle_monitor, True
+    try:
+        seen_at = time.perf_counter()
+        for token_address in bot.decode_token_profiles(session.get(bot.DEXSCREENER_TOKEN_API).content):
+            await bot.process_candidate(token_address)
+    finally:
+        bot.execute_trade, bot.monitor_price, bot.auto_paper = execute_trade, monitor_price, auto_paper
+    return {"buys": len(latencies), "latency_ms": percentiles(latencies)}
+
+def rising_path(start_price, ticks, rng):
+    """Steadily rising prices with noise well inside the trailing stop."""
+    price = start_price
+    path = []
+    for _ in range(ticks):
+        price *= 1.002 * math.exp(rng.gauss(0, 0.0003))
+        path.append(price)
+    return path
+
+def pair_payload(price):
+    return {"pair": {"priceUsd": f"{price:.12f}", "marketCap": price * 1_000_000_000, "liquidity": {"usd": price * 300_000_000}}}
+
+async def run_monitor(session, mint, path, crash=True):
+    """Runs monitor_price over a scripted path; returns (ticks served, last tick served time, sell issued time)."""
+    url = f"{bot.DEXSCREENER_PAIRS_API}/{mint}"
+    payloads = [pair_payload(p) for p in path]
+    if crash:
+        payloads.append(pair_payload(path[-1] * 0.5))
+    session.feed(url, payloads)
+    bot.active_positions[mint] = bot.Position(path[0], 0)
+    await bot.calculate_atr(mint, path[0] / 1.002)  # Seed one bar so the first tick has a true range
+    sell_at = []
+    execute_trade = bot.execute_trade
+
+    async def timed_execute_trade(token_address, buy=True, paper=False):
+        if not buy:
+            sell_at.append(time.perf_counter())
+        return await execute_trade(token_address, buy=buy, paper=paper)
+
+    bot.execute_trade = timed_execute_trade
+    try:
+        await bot.monitor_price(mint, path[0], path[0] * 1_000_000_000, paper=True)
+    finally:
+        bot.execute_trade = execute_trade
+        session.feeds.pop(url, None)
+    return session.served.pop(url, 0), session.served_at.get(url), sell_at[0] if sell_at else None
+
+async def bench_tick_to_sell(args):
+    """Latency from the stop-breaking price tick being served to the sell being issued."""
+    session = RecordedSession()
+    configure_offline(session)
+    reset_bot_state()
+    rng = random.Random(args.seed)
+    latencies = []
+    for i in range(args.exits):
+        path = rising_path(0.0005, 20, rng)
+        _, crash_at, sell_at = await run_monitor(session, f"EXIT{i}", path)
+        if crash_at and sell_at:
+            latencies.append((sell_at - crash_at) * 1000)
+    return {"exits": len(latencies), "latency_ms": percentiles(latencies), "note": "poll scheduler bypassed; see poll_schedule"}
+
+async def bench_poll_schedule(args):
+    """Cost of compute_poll_interval across N open positions with full price history, and the intervals it picks."""
+    reset_bot_state()
+    poll_interval = bot.DATA_POLL_INTERVAL
+    bot.DATA_POLL_INTERVAL = DATA_POLL_INTERVAL
+    rng = random.Random(args.seed)
+    positions = max(args.positions)
+    prices = {}
+    for i in range(positions):
+        mint = f"POLL{i}"
+        price = 0.0005
+        volatility = rng.choice((0.0005, 0.002, 0.005, 0.02))  # per sqrt(second), one-second ticks
+        bot.active_positions[mint] = bot.Position(price, 0)
+        history = bot.price_history[mint] = bot.deque(maxlen=bot.ATR_PERIOD)
+        now = time.monotonic()
+        for step in range(bot.ATR_PERIOD):
+            previous = price
+            price *= math.exp(rng.gauss(0, volatility))
+            if step < bot.ATR_PERIOD - 1:
+                history.append(bot.Bar(max(price, previous), min(price, previous), price, now - bot.ATR_PERIOD + 1 + step))
+        position = bot.active_positions[mint]
+        position.atr = await bot.calculate_atr(mint, price)
+        position.trailing_stop = price - position.atr * bot.ATR_MULTIPLIER
+        prices[mint] = price
+    start = time.perf_counter()
+    for mint, price in prices.items():
+        compute_poll_interval(mint, price)
+    elapsed = time.perf_counter() - start
+    total_rate = sum(1 / interval for interval in bot.poll_intervals.values())
+    result = {"positions": positions, "calls_per_second": positions / elapsed, "interval_s": percentiles(list(bot.poll_intervals.values())), "budget_stretch": max(total_rate / bot.POLL_REQUEST_BUDGET, 1)}
+    bot.DATA_POLL_INTERVAL = poll_interval
+    reset_bot_state()
+    return result
+
+async def bench_backtest_ticks(args):
+    """Price ticks per second through monitor_price's ATR and trailing-stop path."""
+    session = RecordedSession()
+    configure_offline(session)
+    reset_bot_state()
+    rng = random.Random(args.seed)
+    path = rising_path(0.0005, args.ticks, rng)
+    start = time.perf_counter()
+    ticks, _, _ = await run_monitor(session, "BACKTEST", path)
+    elapsed = time.perf_counter() - start
+    return {"ticks": ticks, "seconds": elapsed, "ticks_per_second": ticks / elapsed}
+
+def current_rss_kb():
+    """Resident set size now (ru_maxrss only reports the peak, which the import spike hides)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+def rss_worker(positions, seed, queue):
+    """Opens N paper positions with full price history in a fresh process and reports memory used by bot state."""
+    session = RecordedSession()
+    configure_offline(session)
+    reset_bot_state()
+    baseline_kb = current_rss_kb()
+    market = record_market(session, positions, 1.0, seed)
+    gc.collect()
+    recorded_kb = current_rss_kb()
+    tracemalloc.start()
+
+    async def open_positions():
+        for mint in market.recent:
+            if await bot.execute_trade(mint, buy=True, paper=True):
+                price = bot.active_positions[mint].buy_price
+                for step in range(bot.ATR_PERIOD):
+                    await bot.calculate_atr(mint, price * (1 + 0.01 * step))
+                await bot.execute_trade(mint, buy=False, paper=True)
+                await bot.execute_trade(mint, buy=True, paper=True)
+
+    asyncio.run(open_positions())
+    gc.collect()
+    # Allocations traced since the recorded payloads were built and still alive: the bot's state
+    bot_state_kb = tracemalloc.get_traced_memory()[0] // 1024
+    tracemalloc.stop()
+    opened_kb = current_rss_kb()
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put({"positions": len(bot.active_positions), "trades": len(bot.paper_trades), "baseline_kb": baseline_kb, "recorded_kb": recorded_kb, "opened_kb": opened_kb, "peak_kb": peak_kb, "bot_state_kb": bot_state_kb})
+
+def bench_rss(args):
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for positions in args.positions:
+        queue = context.Queue()
+        process = context.Process(target=rss_worker, args=(positions, args.seed, queue))
+        process.start()
+        results.append(queue.get(timeout=600))
+        process.join()
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                flat.update(flatten(item, f"{name}[{i}]."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = flatten(json.load(f)["results"])
+    for name, value in flatten(current).items():
+        if name in baseline and baseline[name]:
+            change = (value - baseline[name]) / abs(baseline[name]) * 100
+            print(f"{name:60s} {baseline[name]:>14.3f} -> {value:>14.3f} ({change:+.1f}%)")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the sniper bot")
+    parser.add_argument("--tokens", type=int, default=2000, help="synthetic tokens for screening and profile-to-buy")
+    parser.add_argument("--pass-rate", type=float, default=0.2, help="fraction of tokens passing entry filters")
+    parser.add_argument("--exits", type=int, default=200, help="positions driven through a stop-breaking tick")
+    parser.add_argument("--ticks", type=int, default=20000, help="price ticks for the backtest throughput run")
+    parser.add_argument("--positions", type=int, nargs="+", default=[100, 1000, 5000], help="open-position counts for the memory run (the largest also sizes poll_schedule)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", nargs="+", choices=["screening", "profile_to_buy", "tick_to_sell", "poll_schedule", "backtest", "rss"])
+    parser.add_argument("--output", help="results JSON path (default benchmarks/results/<UTC timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    selected = set(args.only or ["screening", "profile_to_buy", "tick_to_sell", "poll_schedule", "backtest", "rss"])
+    results = {}
+    if "screening" in selected:
+        results["screening"] = asyncio.run(bench_screening(args))
+    if "profile_to_buy" in selected:
+        results["profile_to_buy"] = asyncio.run(bench_profile_to_buy(args))
+    if "tick_to_sell" in selected:
+        results["tick_to_sell"] = asyncio.run(bench_tick_to_sell(args))
+    if "poll_schedule" in selected:
+        results["poll_schedule"] = asyncio.run(bench_poll_schedule(args))
+    if "backtest" in selected:
+        results["backtest"] = asyncio.run(bench_backtest_ticks(args))
+    if "rss" in selected:
+        results["rss"] = bench_rss(args)
+    started = datetime.now(timezone.utc)
+    report = {
+        "timestamp": started.isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{started.strftime('%Y%m%dT%H%M%SZ')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results saved to {output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -5,27 +5,54 @@ from solders.keypair import Keypair
 from solana.transaction import Transaction
 from spl.token.instructions import create_associated_token_account, get_associated_token_address
 from aiohttp import web
+import aiohttp
+import base64
+import struct
 import json
+import math
 import os
+try:
+    import orjson  # Optional fast JSON parser
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 import csv
 from datetime import datetime, timedelta
+from collections import deque
 import logging
 import pandas as pd
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from solders.instruction import Instruction, AccountMeta
 from solders.pubkey import Pubkey
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import traceback
+import weakref
+import multiprocessing
+import zlib
 
 # Setup logging to Render disk
-logging.basicConfig(filename='/opt/render/project/src/data/sniper_bot.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+DATA_DIR = os.getenv("DATA_DIR", "/opt/render/project/src/data")
+logging.basicConfig(filename=os.path.join(DATA_DIR, 'sniper_bot.log'), level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Configuration
 WALLET_PRIVATE_KEY = os.getenv("SOLANA_PRIVATE_KEY")
 SOLANA_RPC = os.getenv("SOLANA_RPC", "https://api.mainnet-beta.solana.com")
 SHYFT_API_KEY = os.getenv("SHYFT_API_KEY")
-DEXSCREENER_TOKEN_API = "https://api.dexscreener.com/token-profiles/latest/v1"
-DEXSCREENER_PAIRS_API = "https://api.dexscreener.com/latest/dex/pairs/solana"
-SHYFT_API = "https://api.shyft.to/sol/v1/token"
+DEXSCREENER_TOKEN_API = os.getenv("DEXSCREENER_TOKEN_API", "https://api.dexscreener.com/token-profiles/latest/v1")
+DEXSCREENER_PAIRS_API = os.getenv("DEXSCREENER_PAIRS_API", "https://api.dexscreener.com/latest/dex/pairs/solana")
+SHYFT_API = os.getenv("SHYFT_API", "https://api.shyft.to/sol/v1/token")
+TELEGRAM_API = os.getenv("TELEGRAM_API", "https://api.telegram.org")
+JUPITER_PRICE_API = os.getenv("JUPITER_PRICE_API", "https://api.jup.ag/price/v2")
+RAYDIUM_AMM_PROGRAM = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
+WSOL_MINT = "So11111111111111111111111111111111111111112"
+SOLANA_WS = os.getenv("SOLANA_WS", SOLANA_RPC.replace("https://", "wss://").replace("http://", "ws://"))
+POOL_DISCOVERY = os.getenv("POOL_DISCOVERY", "False") == "True"  # Opt-in: the Raydium logs subscription streams every swap; point SOLANA_WS at a dedicated RPC
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 BACKTEST_MODE = os.getenv("BACKTEST_MODE", "False") == "True"
@@ -49,36 +76,162 @@ MAX_PRICE_IMPACT = 0.05
 MAX_TOKEN_AGE = 6 * 3600
 HEALTH_CHECK_INTERVAL = 3600
 DATA_POLL_INTERVAL = 10
+POLL_INTERVAL_MIN = 0.5  # Fastest per-position price check (near stop / volatile)
+POLL_INTERVAL_MAX = 30  # Slowest per-position price check (calm, far from stop)
+POLL_VOLATILITY_REF = 0.003  # 0.3%/sqrt(s) price volatility with the default stop polls at DATA_POLL_INTERVAL
+POLL_REQUEST_BUDGET = float(os.getenv("POLL_REQUEST_BUDGET", 5))  # Max price checks/second across all positions
 PRIORITY_FEE = 0.002
 MIN_SOL_BALANCE = 0.15
 PORT = int(os.getenv("PORT", 8080))
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", 0.5))  # Seconds of event-loop stall before logging
+LOOP_LAG_INTERVAL = 0.25  # Watchdog heartbeat period
+LOOP_DEBUG = os.getenv("LOOP_DEBUG", "False") == "True"  # Opt-in asyncio debug mode (slow-callback reporting); costly on every task and callback
+PROFILE_MAX_SECONDS = 300
+PRICE_HEDGE_DELAY = float(os.getenv("PRICE_HEDGE_DELAY", 0.3))  # Min wait before hedging a price read to the next source
+PRICE_SOURCE_TIMEOUT = 5  # Give up on a price read after this many seconds
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", 0))  # Scanner/screener processes; 0 scans in the main process
+DISCOVERY_AGE_MARGIN = 15  # Seconds past ENTRY_POOL_AGE_MIN before the first screen, so DexScreener's createdAt clears the age filter
+DISCOVERY_RETRY_WINDOW = 300  # Keep re-screening a discovered pool that fails for this long (pair not indexed yet, thin first-minute data)
+DISCOVERY_RETRY_MAX = 60  # Backoff cap between re-screens
+DISCOVERY_MIN_SOL_LIQUIDITY = 48  # ~ENTRY_LP_MIN_USD / 2 at $310/SOL, quote side of a new pool
 
 # HTTP session with retries
 session = requests.Session()
 retries = Retry(total=3, backoff_factor=2, status_forcelist=[429, 500, 502, 503, 504])
 session.mount("https://", HTTPAdapter(max_retries=retries))
+session.mount("http://", HTTPAdapter(max_retries=retries))
+
+class Position:
+    """Open position state; slotted so large paper portfolios stay cheap."""
+    __slots__ = ("buy_price", "gain", "atr", "trailing_stop")
+
+    def __init__(self, buy_price, atr):
+        self.buy_price = buy_price
+        self.gain = 1.0
+        self.atr = atr
+        self.trailing_stop = buy_price - atr * ATR_MULTIPLIER
+
+class Trade:
+    """Paper trade record with an epoch timestamp; price is the buy or sell price."""
+    __slots__ = ("token", "trade_type", "price", "amount", "profit", "timestamp")
+
+    def __init__(self, token, trade_type, price, amount=None, profit=None):
+        self.token = token
+        self.trade_type = trade_type
+        self.price = price
+        self.amount = amount
+        self.profit = profit
+        self.timestamp = datetime.now().timestamp()
+
+    def as_dict(self):
+        """Row for the trade CSVs, keeping the original column names."""
+        row = {"token": self.token, "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(), "trade_type": self.trade_type}
+        if self.trade_type == "buy":
+            row.update(buy_price=self.price, amount=self.amount)
+        else:
+            row.update(sell_price=self.price, profit=self.profit)
+        return row
+
+class Bar:
+    """One price_history bar for ATR, stamped with monotonic time so ATR can be scaled to the tick spacing."""
+    __slots__ = ("high", "low", "close", "time")
+
+    def __init__(self, high, low, close, at=None):
+        self.high = high
+        self.low = low
+        self.close = close
+        self.time = time.monotonic() if at is None else at
+
+class PairSnapshot:
+    """The DexScreener pair fields the bot uses, extracted so the raw payload can be dropped."""
+    __slots__ = ("market_cap", "liquidity", "price", "price_native", "price_change_m5", "price_change_h1", "volume_1h", "created_at", "pair_address")
+
+    def __init__(self, pair):
+        price_change = pair.get("priceChange", {})
+        self.market_cap = float(pair.get("marketCap", 0))
+        self.liquidity = float(pair.get("liquidity", {}).get("usd", 0))
+        self.price = float(pair.get("priceUsd", 0))
+        self.price_native = float(pair.get("priceNative", 0))
+        self.price_change_m5 = float(price_change.get("m5", 0))
+        self.price_change_h1 = float(price_change.get("h1", 0))
+        self.volume_1h = float(pair.get("volume", {}).get("h1", 0))
+        self.created_at = pair.get("createdAt", None)
+        self.pair_address = pair.get("pairAddress", None)
+
+class PriceSource:
+    """A price provider with latency and error stats used to rank hedged reads."""
+    __slots__ = ("name", "fetch", "latency", "error_rate", "requests", "errors")
+
+    def __init__(self, name, fetch):
+        self.name = name
+        self.fetch = fetch
+        self.latency = None  # EWMA seconds of successful reads
+        self.error_rate = 0.0  # EWMA of failed reads
+        self.requests = 0
+        self.errors = 0
+
+    def score(self):
+        return (self.latency or PRICE_HEDGE_DELAY) * (1 + 4 * self.error_rate)
+
+    def hedge_delay(self):
+        """How long to wait on this source before hedging to the next one."""
+        return min(max((self.latency or PRICE_HEDGE_DELAY) * 1.5, PRICE_HEDGE_DELAY), PRICE_SOURCE_TIMEOUT)
+
+    async def read(self, token_address):
+        """Fetches a USD price, recording latency and errors; returns None on failure."""
+        self.requests += 1
+        start = time.monotonic()
+        try:
+            price = await asyncio.wait_for(self.fetch(token_address), PRICE_SOURCE_TIMEOUT)
+        except asyncio.CancelledError:
+            # Hedged away: count the time spent as a lower bound on this source's latency
+            elapsed = time.monotonic() - start
+            self.latency = elapsed if self.latency is None else 0.8 * self.latency + 0.2 * max(elapsed, self.latency)
+            raise
+        except Exception as e:
+            logging.warning(f"{self.name} price read failed for {token_address}: {str(e)}")
+            price = None
+        if price and price > 0:
+            elapsed = time.monotonic() - start
+            self.latency = elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+            self.error_rate *= 0.8
+            return price
+        self.errors += 1
+        self.error_rate = 0.8 * self.error_rate + 0.2
+        return None
 
 # Global state
 loss_streak = 0
 trade_count = 0
 last_trade_day = datetime.now().date()
 current_buy_amount = BUY_AMOUNT_MIN
-paper_trades = []
-active_positions = {}  # token: {"buy_price": float, "gain": float, "atr": float, "trailing_stop": float}
-price_history = {}
-api_cache = {}  # Cache for API responses
+paper_trades = []  # Trade records
+active_positions = {}  # token: Position
+price_history = {}  # token: deque of the last ATR_PERIOD Bars
+poll_intervals = {}  # token: seconds until next price check
+price_http = (None, None)  # (event loop, aiohttp session) for exit price reads
+price_rpc = (None, None)  # (event loop, AsyncClient) for on-chain exit price reads
+api_cache = {}  # Cache for API responses (pair payloads cached as PairSnapshot)
 wallet_cache = {}  # Cache for wallet balance
 processed_tokens = set()
+screening_tokens = set()  # Candidates currently being screened, so feeds never double-buy
+discovery_queue = asyncio.Queue()  # (mint, pool open time) from on-chain pool discovery
+shard_inboxes = []  # Per scan worker multiprocessing queues of ("pool", mint, open time) / ("skipped", mint, None)
 paper_trading = False
 auto_paper = False
 telegram_offset = 0  # For Telegram getUpdates
+loop_heartbeat = 0.0  # Monotonic time the watchdog last ran on the event loop
+loop_lag = 0.0  # Last measured event-loop lag
+loop_lag_max = 0.0
+task_started = weakref.WeakKeyDictionary()  # asyncio task: monotonic creation time
+profiling = False
 
 async def send_notification(message, chat_id=TELEGRAM_CHAT_ID):
     """Sends a Telegram notification with minimal latency."""
     if not TELEGRAM_BOT_TOKEN or not chat_id:
         logging.error("Telegram bot token or chat ID missing")
         return False
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    url = f"{TELEGRAM_API}/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     payload = {"chat_id": chat_id, "text": message}
     try:
         response = session.post(url, json=payload)
@@ -145,7 +298,7 @@ async def check_rug(token_address, is_backtest=False):
             try:
                 response = session.get(f"{SHYFT_API}/{token_address}", headers=headers)
                 if response.status_code == 200:
-                    data = response.json().get("result", {})
+                    data = json_loads(response.content).get("result", {})
                     rug_detected = data.get("is_suspicious") or not data.get("liquidity_locked")
                     api_cache[cache_key] = (rug_detected, datetime.now().timestamp())
                     if rug_detected:
@@ -164,72 +317,198 @@ async def check_rug(token_address, is_backtest=False):
 async def calculate_atr(token_address, current_price):
     """Calculates ATR for trailing stop with error handling."""
     try:
-        if token_address not in price_history:
-            price_history[token_address] = []
+        history = price_history.get(token_address)
+        if history is None:
+            history = price_history[token_address] = deque(maxlen=ATR_PERIOD)
         high = current_price
         low = current_price
         close = current_price
-        if price_history[token_address]:
-            prev_close = price_history[token_address][-1]["close"]
+        if history:
+            prev_close = history[-1].close
             high = max(high, prev_close)
             low = min(low, prev_close)
-        price_history[token_address].append({"high": high, "low": low, "close": close})
-        if len(price_history[token_address]) > ATR_PERIOD:
-            price_history[token_address] = price_history[token_address][-ATR_PERIOD:]
+        history.append(Bar(high, low, close))
         true_ranges = []
-        for i in range(1, len(price_history[token_address])):
-            high_low = price_history[token_address][i]["high"] - price_history[token_address][i]["low"]
-            high_prev_close = abs(price_history[token_address][i]["high"] - price_history[token_address][i-1]["close"])
-            low_prev_close = abs(price_history[token_address][i]["low"] - price_history[token_address][i-1]["close"])
-            true_ranges.append(max(high_low, high_prev_close, low_prev_close))
+        prev = None
+        for bar in history:
+            if prev is not None:
+                true_ranges.append(max(bar.high - bar.low, abs(bar.high - prev.close), abs(bar.low - prev.close)))
+            prev = bar
         return sum(true_ranges) / len(true_ranges) if true_ranges else 0
     except Exception as e:
         logging.error(f"ATR calculation error for {token_address}: {str(e)}")
         return 0
 
+def compute_poll_interval(token_address, current_price, stop=None):
+    """Sets a position's refresh interval from its per-second volatility and distance in ATRs to the given stop (default its trailing stop), within the request budget."""
+    position = active_positions.get(token_address)
+    if not position or current_price <= 0:
+        poll_intervals.pop(token_address, None)
+        return DATA_POLL_INTERVAL
+    history = price_history.get(token_address)
+    if not history or len(history) < 2:
+        interval = DATA_POLL_INTERVAL
+    elif position.atr <= 0:
+        interval = POLL_INTERVAL_MAX
+    else:
+        # ATR is measured per poll tick and grows with sqrt(tick spacing) for a random walk; dividing
+        # that out gives a rate that does not shrink when we poll faster
+        tick = max((history[-1].time - history[0].time) / (len(history) - 1), 0.001)
+        volatility = position.atr / current_price / math.sqrt(tick)
+        stop_atrs = max(current_price - (position.trailing_stop if stop is None else stop), 0) / position.atr
+        # Time for the price to cover the stop distance grows with (distance / volatility) squared
+        interval = DATA_POLL_INTERVAL * (POLL_VOLATILITY_REF * stop_atrs / (volatility * ATR_MULTIPLIER)) ** 2
+    return schedule_poll(token_address, interval)
+
+def schedule_poll(token_address, interval):
+    """Records a position's next price check, stretched so all positions together stay within the request budget."""
+    interval = min(max(interval, POLL_INTERVAL_MIN), POLL_INTERVAL_MAX)
+    poll_intervals[token_address] = interval
+    # Stretch every position evenly when the combined poll rate exceeds the budget
+    total_rate = sum(1 / i for i in poll_intervals.values())
+    if total_rate > POLL_REQUEST_BUDGET:
+        interval *= total_rate / POLL_REQUEST_BUDGET
+    return interval
+
+def decode_pair(content):
+    """Decodes a DexScreener pair response straight into a PairSnapshot (None without a pair); the raw payload is never kept."""
+    data = json_loads(content)
+    pair = data.get("pair") if isinstance(data, dict) else None
+    return PairSnapshot(pair) if pair else None
+
+def decode_token_profiles(content):
+    """Decodes the token-profiles list into Solana mint addresses (None if not a list)."""
+    data = json_loads(content)
+    if not isinstance(data, list):
+        return None
+    return [token["tokenAddress"] for token in data if isinstance(token, dict) and token.get("chainId") == "solana" and token.get("tokenAddress")]
+
+def price_session():
+    """aiohttp session for price reads, without retries, so a hedged-away read is aborted instead of holding a thread."""
+    global price_http
+    loop = asyncio.get_running_loop()
+    if price_http[0] is not loop or price_http[1].closed:
+        price_http = (loop, aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=PRICE_SOURCE_TIMEOUT)))
+    return price_http[1]
+
+def price_rpc_client():
+    """Solana RPC client for on-chain price reads, kept per event loop so hedged reads reuse its connections."""
+    global price_rpc
+    loop = asyncio.get_running_loop()
+    if price_rpc[0] is not loop:
+        price_rpc = (loop, AsyncClient(SOLANA_RPC, timeout=PRICE_SOURCE_TIMEOUT))
+    return price_rpc[1]
+
+async def fetch_price_dexscreener(token_address):
+    """Reads the pair price from DexScreener and refreshes the cached PairSnapshot."""
+    async with price_session().get(f"{DEXSCREENER_PAIRS_API}/{token_address}") as response:
+        if response.status != 200:
+            raise ValueError(f"Status {response.status}")
+        content = await response.read()
+    snapshot = decode_pair(content)
+    if snapshot is None:
+        raise ValueError("Invalid JSON response")
+    api_cache[f"{DEXSCREENER_PAIRS_API}/{token_address}"] = (snapshot, datetime.now().timestamp())
+    return snapshot.price
+
+async def fetch_price_jupiter(token_address):
+    """Reads the USD price from the Jupiter price API."""
+    async with price_session().get(JUPITER_PRICE_API, params={"ids": token_address}) as response:
+        if response.status != 200:
+            raise ValueError(f"Status {response.status}")
+        content = await response.read()
+    entry = (json_loads(content).get("data") or {}).get(token_address)
+    return float(entry["price"]) if entry and entry.get("price") else None
+
+async def fetch_price_onchain(token_address):
+    """Prices the token from its Raydium pool vault reserves, converted to USD with the last DexScreener quote rate."""
+    snapshot = api_cache.get(f"{DEXSCREENER_PAIRS_API}/{token_address}", (None, 0))[0]
+    if not snapshot or not snapshot.pair_address or not snapshot.price_native:
+        return None
+    sol_client = price_rpc_client()
+    pool = await sol_client.get_account_info(Pubkey.from_string(snapshot.pair_address))
+    if not pool.value or str(pool.value.owner) != RAYDIUM_AMM_PROGRAM:
+        return None
+    data = bytes(pool.value.data)
+    # Raydium AMM v4 layout: base vault @336, quote vault @368, base mint @400
+    base_vault = Pubkey.from_bytes(data[336:368])
+    quote_vault = Pubkey.from_bytes(data[368:400])
+    base_mint = str(Pubkey.from_bytes(data[400:432]))
+    base, quote = await asyncio.gather(sol_client.get_token_account_balance(base_vault), sol_client.get_token_account_balance(quote_vault))
+    base_amount = int(base.value.amount) / 10 ** base.value.decimals
+    quote_amount = int(quote.value.amount) / 10 ** quote.value.decimals
+    if not base_amount or not quote_amount:
+        return None
+    price_native = quote_amount / base_amount if base_mint == token_address else base_amount / quote_amount
+    return price_native * snapshot.price / snapshot.price_native
+
+price_sources = [
+    PriceSource("dexscreener", fetch_price_dexscreener),
+    PriceSource("jupiter", fetch_price_jupiter),
+    PriceSource("onchain", fetch_price_onchain),
+]
+
+async def get_price(token_address):
+    """Hedged price read: starts the best-ranked source, adds the next one whenever the current is slow or fails, and returns the first valid price."""
+    ranked = sorted(price_sources, key=lambda source: source.score())
+    pending = set()
+    try:
+        for i, source in enumerate(ranked):
+            pending.add(asyncio.create_task(source.read(token_address)))
+            last = i == len(ranked) - 1
+            deadline = time.monotonic() + (PRICE_SOURCE_TIMEOUT if last else source.hedge_delay())
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result():
+                        return task.result()
+                if not done or not last:
+                    break
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
 async def check_token(token_address, is_backtest=False):
     """Validates token using DexScreener with new filters."""
     cache_key = f"{DEXSCREENER_PAIRS_API}/{token_address}"
     cached_data, cached_time = api_cache.get(cache_key, (None, 0))
+    snapshot = None
     if cached_data and datetime.now().timestamp() - cached_time < 60:
-        data = cached_data
+        snapshot = cached_data
     else:
         for _ in range(3):
             try:
                 response = session.get(f"{DEXSCREENER_PAIRS_API}/{token_address}")
                 if response.status_code == 200:
                     try:
-                        data = response.json()
-                        if data is None or not isinstance(data, dict) or "pair" not in data or not data["pair"]:
+                        snapshot = decode_pair(response.content)
+                        if snapshot is None:
                             logging.error(f"DexScreener token check failed for {token_address}: Invalid JSON response - {response.text}")
-                            data = None
                             continue
-                        api_cache[cache_key] = (data, datetime.now().timestamp())
+                        api_cache[cache_key] = (snapshot, datetime.now().timestamp())
                         break
                     except json.JSONDecodeError as e:
                         logging.error(f"DexScreener token check failed for {token_address}: JSON decode error - {str(e)}")
-                        data = None
                         continue
+                    except (ValueError, TypeError, AttributeError) as e:
+                        logging.error(f"Data parsing error for {token_address}: {str(e)}")
+                        return None, None, None
                 logging.error(f"DexScreener token check failed for {token_address}: Status {response.status_code} - {response.text}")
             except Exception as e:
                 logging.error(f"Token check error for {token_address}: {str(e)}")
             await asyncio.sleep(2)
-        if data is None or not isinstance(data, dict):
+        if snapshot is None:
             logging.error(f"Token check failed for {token_address}: No valid response data after retries")
             return None, None, None
-    try:
-        pair = data.get("pair", {})
-        market_cap = float(pair.get("marketCap", 0))
-        liquidity = float(pair.get("liquidity", {}).get("usd", 0))
-        price = float(pair.get("priceUsd", 0))
-        price_impact = float(pair.get("priceChange", {}).get("m5", 0))
-        created_at = pair.get("createdAt", None)
-        volume_1h = float(pair.get("volume", {}).get("h1", 0))
-        price_change_1h = float(pair.get("priceChange", {}).get("h1", 0))
-        acceleration = price_change_1h / 60 if price_change_1h > 0 else 0
-    except (ValueError, TypeError, KeyError) as e:
-        logging.error(f"Data parsing error for {token_address}: {str(e)}")
-        return None, None, None
+    market_cap = snapshot.market_cap
+    liquidity = snapshot.liquidity
+    price = snapshot.price
+    price_impact = snapshot.price_change_m5
+    created_at = snapshot.created_at
+    volume_1h = snapshot.volume_1h
+    price_change_1h = snapshot.price_change_h1
+    acceleration = price_change_1h / 60 if price_change_1h > 0 else 0
     max_cap = ENTRY_MC_MAX / (2 if loss_streak >= LOSS_STREAK_THRESHOLD else 1)
     if not (ENTRY_MC_MIN <= market_cap <= max_cap) or liquidity < ENTRY_LP_MIN_USD or (liquidity / market_cap) < ENTRY_LP_TO_MCAP_MIN or abs(price_impact) > MAX_PRICE_IMPACT or volume_1h < VOL1H_MIN or acceleration < ACCEL_MIN:
         logging.info(f"Token {token_address} filtered out: market_cap={market_cap}, liquidity={liquidity}, lp_to_mcap={liquidity / market_cap}, price_impact={price_impact}, volume_1h={volume_1h}, acceleration={acceleration}")
@@ -248,7 +527,7 @@ async def check_token(token_address, is_backtest=False):
     if not is_backtest and await check_rug(token_address, is_backtest):
         logging.info(f"Token {token_address} filtered out: Rug detected")
         return None, None, None
-    price_volatility = float(pair.get("priceChange", {}).get("m5", 0))
+    price_volatility = snapshot.price_change_m5
     if abs(price_volatility) > 15:
         logging.info(f"Token {token_address} filtered out: High volatility")
         return None, None, None
@@ -267,14 +546,15 @@ async def execute_trade(token_address, buy=True, paper=False):
                     logging.info(f"Skipping trade for {token_address}: Failed token check")
                     return False
                 atr = await calculate_atr(token_address, buy_price)
-                active_positions[token_address] = {"buy_price": buy_price, "gain": 1.0, "atr": atr, "trailing_stop": buy_price - atr * ATR_MULTIPLIER}
-                paper_trades.append({"token": token_address, "buy_price": buy_price, "amount": current_buy_amount, "timestamp": datetime.now().isoformat(), "trade_type": "buy"})
+                active_positions[token_address] = Position(buy_price, atr)
+                paper_trades.append(Trade(token_address, "buy", buy_price, amount=current_buy_amount))
             else:
                 if token_address not in active_positions:
                     logging.info(f"Skipping sell for {token_address}: No active position")
                     return False
-                profit = (active_positions[token_address]["gain"] - 1) * current_buy_amount * 310
-                paper_trades.append({"token": token_address, "sell_price": active_positions[token_address]["buy_price"] * active_positions[token_address]["gain"], "profit": profit, "timestamp": datetime.now().isoformat(), "trade_type": "sell"})
+                position = active_positions[token_address]
+                profit = (position.gain - 1) * current_buy_amount * 310
+                paper_trades.append(Trade(token_address, "sell", position.buy_price * position.gain, profit=profit))
                 if profit > 0:
                     current_buy_amount = min(BUY_AMOUNT_MAX * 2, current_buy_amount + profit * PROFIT_REINVEST_RATIO / 310)
                 active_positions.pop(token_address, None)
@@ -295,7 +575,7 @@ async def execute_trade(token_address, buy=True, paper=False):
                 tx.add(create_associated_token_account(keypair.pubkey(), keypair.pubkey(), token_mint))
             tx.add(
                 Instruction(
-                    program_id=Pubkey.from_string("675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"),
+                    program_id=Pubkey.from_string(RAYDIUM_AMM_PROGRAM),
                     data=bytes([1 if buy else 2]),
                     accounts=[
                         AccountMeta(pubkey=keypair.pubkey(), is_signer=True, is_writable=True),
@@ -315,14 +595,15 @@ async def execute_trade(token_address, buy=True, paper=False):
                             return False
                         atr = await calculate_atr(token_address, buy_price)
                         await send_notification(f"🚀 Sniping {token_address} at ${market_cap} with {current_buy_amount} SOL (~$15)! MOON TIME! 😘")
-                        active_positions[token_address] = {"buy_price": buy_price, "gain": 1.0, "atr": atr, "trailing_stop": buy_price - atr * ATR_MULTIPLIER}
+                        active_positions[token_address] = Position(buy_price, atr)
                     else:
-                        profit = (active_positions[token_address]["gain"] - 1) * current_buy_amount * 310
+                        position = active_positions[token_address]
+                        profit = (position.gain - 1) * current_buy_amount * 310
                         await send_notification(
-                            f"💸 Sold {token_address}! Profit: {active_positions[token_address]['gain']:.2f}x 🤑"
-                            if active_positions[token_address]["gain"] > 1
+                            f"💸 Sold {token_address}! Profit: {position.gain:.2f}x 🤑"
+                            if position.gain > 1
                             else f"😢 Sold {token_address}, loss taken. Let’s bounce back! 💔",
-                            is_win=active_positions[token_address]["gain"] > 1
+                            is_win=position.gain > 1
                         )
                         if profit > 0:
                             current_buy_amount = min(BUY_AMOUNT_MAX * 2, current_buy_amount + profit * PROFIT_REINVEST_RATIO / 310)
@@ -344,48 +625,47 @@ async def monitor_price(token_address, buy_price, market_cap, paper=False):
     try:
         global loss_streak, paper_trades
         start_time = datetime.now()
+        failures = 0
         while (datetime.now() - start_time).seconds < 7200:
             cache_key = f"{DEXSCREENER_PAIRS_API}/{token_address}"
             cached_data, cached_time = api_cache.get(cache_key, (None, 0))
-            if cached_data and datetime.now().timestamp() - cached_time < 60:
-                data = cached_data
+            if cached_data and datetime.now().timestamp() - cached_time < min(60, poll_intervals.get(token_address, DATA_POLL_INTERVAL)):
+                current_price = cached_data.price
             else:
-                response = session.get(f"{DEXSCREENER_PAIRS_API}/{token_address}")
-                if response.status_code != 200:
-                    logging.error(f"Price check failed for {token_address}: Status {response.status_code} - {response.text}")
-                    break
-                try:
-                    data = response.json()
-                    if data is None or not isinstance(data, dict) or "pair" not in data or not data["pair"]:
-                        logging.error(f"Price check failed for {token_address}: Invalid JSON response - {response.text}")
-                        break
-                    api_cache[cache_key] = (data, datetime.now().timestamp())
-                except json.JSONDecodeError as e:
-                    logging.error(f"Price check failed for {token_address}: JSON decode error - {str(e)}")
-                    break
-            current_price = float(data.get("pair", {}).get("priceUsd", 0))
-            market_cap = float(data.get("pair", {}).get("marketCap", 0))
+                current_price = await get_price(token_address)
+            if not current_price:
+                # Keep enforcing the stop: retry with backoff instead of abandoning the position
+                failures += 1
+                logging.error(f"Price check failed for {token_address}: No valid price from any source ({failures} in a row)")
+                await asyncio.sleep(schedule_poll(token_address, POLL_INTERVAL_MIN * 2 ** min(failures, 6)))
+                continue
+            failures = 0
             atr = await calculate_atr(token_address, current_price)
-            active_positions[token_address]["atr"] = atr
-            active_positions[token_address]["trailing_stop"] = current_price - atr * ATR_MULTIPLIER
-            active_positions[token_address]["gain"] = current_price / buy_price
+            position = active_positions[token_address]
+            # The stop is reset from this price below, so schedule from the stop the price was falling toward
+            previous_stop = position.trailing_stop
+            position.atr = atr
+            position.trailing_stop = current_price - atr * ATR_MULTIPLIER
+            position.gain = current_price / buy_price
             if not paper and await check_rug(token_address, is_backtest=paper):
                 await execute_trade(token_address, buy=False, paper=paper)
                 profit = (current_price - buy_price) * current_buy_amount * 310
                 await send_notification(f"😾 Rug alert on {token_address}! Sold at ${current_price:.6f} for {profit:.1f}%! Saved our bag! 😿", is_win=profit > 0)
                 loss_streak = loss_streak + 1 if current_price < buy_price else 0
-                paper_trades.append({"token": token_address, "sell_price": current_price, "profit": profit, "timestamp": datetime.now().isoformat(), "trade_type": "sell"})
+                paper_trades.append(Trade(token_address, "sell", current_price, profit=profit))
                 break
-            if current_price <= active_positions[token_address]["trailing_stop"]:
+            if current_price <= position.trailing_stop:
                 await execute_trade(token_address, buy=False, paper=paper)
                 profit = (current_price - buy_price) * current_buy_amount * 310
                 await send_notification(f"💸 Trailing stop hit for {token_address} at ${current_price:.6f} for {profit:.1f}%! 💪", is_win=profit > 0)
                 loss_streak = loss_streak + 1 if current_price < buy_price else 0
-                paper_trades.append({"token": token_address, "sell_price": current_price, "profit": profit, "timestamp": datetime.now().isoformat(), "trade_type": "sell"})
+                paper_trades.append(Trade(token_address, "sell", current_price, profit=profit))
                 break
-            await asyncio.sleep(DATA_POLL_INTERVAL)
+            await asyncio.sleep(compute_poll_interval(token_address, current_price, previous_stop))
     except Exception as e:
         logging.error(f"Monitor price error for {token_address}: {str(e)}")
+    finally:
+        poll_intervals.pop(token_address, None)
 
 async def start_command(chat_id):
     """Sends a welcome message to start the bot."""
@@ -411,6 +691,8 @@ async def help_command(chat_id):
             "/trades or ?trades — Saves and shows paper trade history CSV path\n"
             "/autopaper or ?autopaper on|off — Toggles auto paper trading\n"
             "/export or ?export — Shows paths to backtest and trade CSVs\n"
+            "/profile or ?profile <seconds> — Profiles the running bot and saves a summary\n"
+            "/tasks or ?tasks — Lists live asyncio tasks with their ages\n"
             "/ping or ?ping — Checks if the bot is running"
         )
         await send_notification(help_message, chat_id)
@@ -437,6 +719,10 @@ async def status_command(chat_id):
                 except Exception:
                     rpc_ok = False
         mode = "Paper" if paper_trading else "Live"
+        price_sources_status = ", ".join(
+            f"{source.name} {source.latency * 1000:.0f}ms {source.errors}/{source.requests} err" if source.latency is not None else f"{source.name} {source.errors}/{source.requests} err"
+            for source in sorted(price_sources, key=lambda source: source.score())
+        )
         status_message = (
             f"🔍 Dopamine Sniper Bot Status Report\n"
             f"Mode: {mode}\n"
@@ -445,6 +731,7 @@ async def status_command(chat_id):
             f"DexScreener Pairs API: {dex_pairs_status}\n"
             f"Shyft API: {shyft_status}\n"
             f"Solana RPC: {'✅ OK' if rpc_ok else '❌ Failed or Not Set'}\n"
+            f"Price Sources: {price_sources_status}\n"
             f"Active Positions: {len(active_positions)}\n"
             f"Trade Count Today: {trade_count}/{MAX_TRADES_PER_DAY}\n"
             f"Last Trade Day: {last_trade_day}"
@@ -544,11 +831,11 @@ async def backtest_command(chat_id):
                 try:
                     response = session.get(DEXSCREENER_TOKEN_API)
                     if response.status_code == 200:
-                        data = response.json()
-                        if data is None or not isinstance(data, list) or not data:
+                        tokens = decode_token_profiles(response.content)
+                        if tokens is None:
                             logging.error(f"DexScreener Token API invalid response: {response.text}")
+                            tokens = []
                             continue
-                        tokens = [token for token in data if token.get("chainId") == "solana" and token.get("tokenAddress")]
                         api_cache[cache_key] = (tokens, datetime.now().timestamp())
                         logging.info(f"Fetched {len(tokens)} tokens from DexScreener")
                         break
@@ -562,19 +849,19 @@ async def backtest_command(chat_id):
             return
         tokens_processed = 0
         for token in tokens[:20]:
-            logging.info(f"Processing token: {token['tokenAddress']}")
-            if len([t for t in paper_trades if t["trade_type"] == "sell" and t["profit"] > 0]) >= MAX_TRADES_PER_DAY and datetime.now().date() == last_trade_day:
+            logging.info(f"Processing token: {token}")
+            if len([t for t in paper_trades if t.trade_type == "sell" and t.profit > 0]) >= MAX_TRADES_PER_DAY and datetime.now().date() == last_trade_day:
                 logging.info("Max trades per day reached, stopping backtest")
                 break
-            market_cap, buy_price, liquidity = await check_token(token["tokenAddress"], is_backtest=True)
+            market_cap, buy_price, liquidity = await check_token(token, is_backtest=True)
             if market_cap:
                 tokens_processed += 1
-                logging.info(f"Token {token['tokenAddress']} passed filters, executing trade")
-                success = await execute_trade(token["tokenAddress"], buy=True, paper=True)
+                logging.info(f"Token {token} passed filters, executing trade")
+                success = await execute_trade(token, buy=True, paper=True)
                 if success:
-                    await monitor_price(token["tokenAddress"], buy_price, market_cap, paper=True)
+                    await monitor_price(token, buy_price, market_cap, paper=True)
             else:
-                logging.info(f"Token {token['tokenAddress']} failed filters")
+                logging.info(f"Token {token} failed filters")
         if tokens_processed == 0:
             logging.warning("No tokens passed filters during backtest")
             await send_notification("😿 No tokens passed filters during backtest! Check filters or try again later. 💔", chat_id)
@@ -583,7 +870,7 @@ async def backtest_command(chat_id):
             logging.warning("No trades executed during backtest")
             await send_notification("😿 No trades executed during backtest! No results available. 💔", chat_id)
             return
-        df = pd.DataFrame(paper_trades)
+        df = pd.DataFrame([t.as_dict() for t in paper_trades])
         if 'trade_type' not in df.columns:
             logging.error("trade_type column missing in paper_trades")
             await send_notification("😿 Backtest failed: No valid trade data! 💔", chat_id)
@@ -592,7 +879,7 @@ async def backtest_command(chat_id):
         win_rate = (len(sell_trades[sell_trades["profit"] > 0]) / len(sell_trades) * 100) if not sell_trades.empty else 0
         avg_profit = sell_trades["profit"].mean() if not sell_trades.empty else 0
         total_profit = sell_trades["profit"].sum() if not sell_trades.empty else 0
-        csv_path = "/opt/render/project/src/data/backtest_results.csv"
+        csv_path = os.path.join(DATA_DIR, "backtest_results.csv")
         try:
             os.makedirs(os.path.dirname(csv_path), exist_ok=True)
             with open(csv_path, "w", newline="") as f:
@@ -620,9 +907,9 @@ async def portfolio_command(chat_id):
     try:
         paper_balance = BUY_AMOUNT_MIN * 310
         for trade in paper_trades:
-            if trade["trade_type"] == "sell":
-                paper_balance += trade["profit"]
-        positions = "\n".join([f"{token}: ${pos['buy_price']:.6f} (Gain: {pos['gain']:.2f}x, Trailing Stop: ${pos['trailing_stop']:.6f})" for token, pos in active_positions.items()])
+            if trade.trade_type == "sell":
+                paper_balance += trade.profit
+        positions = "\n".join([f"{token}: ${pos.buy_price:.6f} (Gain: {pos.gain:.2f}x, Trailing Stop: ${pos.trailing_stop:.6f})" for token, pos in active_positions.items()])
         message = (
             f"📈 Paper Portfolio\n"
             f"Balance: ${paper_balance:.2f}\n"
@@ -636,10 +923,10 @@ async def portfolio_command(chat_id):
 async def trades_command(chat_id):
     """Saves and shows paper trade history CSV path."""
     try:
-        csv_path = "/opt/render/project/src/data/paper_trades.csv"
+        csv_path = os.path.join(DATA_DIR, "paper_trades.csv")
         os.makedirs(os.path.dirname(csv_path), exist_ok=True)
         with open(csv_path, "w", newline="") as f:
-            pd.DataFrame(paper_trades).to_csv(f, index=False)
+            pd.DataFrame([t.as_dict() for t in paper_trades]).to_csv(f, index=False)
         await send_notification(f"📜 Paper Trade History\nSaved to {csv_path}", chat_id)
     except Exception as e:
         logging.error(f"Error in /trades command: {str(e)}")
@@ -667,8 +954,8 @@ async def autopaper_command(chat_id, args):
 async def export_command(chat_id):
     """Shows paths to backtest and trade CSVs."""
     try:
-        backtest_path = "/opt/render/project/src/data/backtest_results.csv"
-        trades_path = "/opt/render/project/src/data/paper_trades.csv"
+        backtest_path = os.path.join(DATA_DIR, "backtest_results.csv")
+        trades_path = os.path.join(DATA_DIR, "paper_trades.csv")
         message = (
             f"📂 Export Paths\n"
             f"Backtest Results: {backtest_path if os.path.exists(backtest_path) else 'Not generated'}\n"
@@ -679,6 +966,73 @@ async def export_command(chat_id):
         logging.error(f"Error in /export command: {str(e)}")
         await send_notification(f"😿 Error in /export command: {str(e)} 💔", chat_id)
 
+async def capture_profile(chat_id, seconds):
+    """Runs cProfile on the event loop thread for the given seconds and writes a summary file."""
+    global profiling
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        path = os.path.join(DATA_DIR, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        profiler.dump_stats(f"{path}.prof")
+        with open(f"{path}.txt", "w") as f:
+            f.write(f"Profile of {seconds}s captured at {datetime.now().isoformat()}\n\n")
+            pstats.Stats(profiler, stream=f).sort_stats("tottime").print_stats(40)
+            pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+        top = io.StringIO()
+        pstats.Stats(profiler, stream=top).sort_stats("tottime").print_stats(5)
+        hotspots = "\n".join(line.strip() for line in top.getvalue().splitlines() if line.strip())[-1500:]
+        await send_notification(f"🔬 Profile saved to {path}.txt\n{hotspots}", chat_id)
+    except Exception as e:
+        logging.error(f"Profile capture error: {str(e)}")
+        await send_notification(f"😿 Profile capture failed! {str(e)} 💔", chat_id)
+    finally:
+        profiling = False
+
+async def profile_command(chat_id, args):
+    """Starts a profile of the running bot for the given number of seconds."""
+    global profiling
+    try:
+        if profiling:
+            await send_notification("🔬 A profile is already running, try again when it finishes.", chat_id)
+            return
+        try:
+            seconds = int(args[0]) if args else 30
+        except ValueError:
+            await send_notification("Use /profile <seconds>", chat_id)
+            return
+        seconds = min(max(seconds, 1), PROFILE_MAX_SECONDS)
+        # Claimed here, before any await, so a second /profile in the same batch sees it
+        profiling = True
+        asyncio.create_task(capture_profile(chat_id, seconds), name="profile")
+        await send_notification(f"🔬 Profiling the bot for {seconds}s...", chat_id)
+    except Exception as e:
+        logging.error(f"Error in /profile command: {str(e)}")
+        await send_notification(f"😿 Error in /profile command: {str(e)} 💔", chat_id)
+
+async def tasks_command(chat_id):
+    """Lists live asyncio tasks with their ages, oldest first."""
+    try:
+        now = time.monotonic()
+        tasks = sorted(asyncio.all_tasks(), key=lambda task: task_started.get(task, now))
+        lines = []
+        for task in tasks[:30]:
+            started = task_started.get(task)
+            age = f"{now - started:.0f}s" if started is not None else "?"
+            lines.append(f"{age} {task.get_name()} {getattr(task.get_coro(), '__qualname__', task.get_coro())}")
+        message = (
+            f"🧵 Live Tasks ({len(tasks)})\n"
+            f"Loop Lag: {loop_lag * 1000:.0f}ms (max {loop_lag_max * 1000:.0f}ms)\n"
+            + "\n".join(lines)
+        )
+        await send_notification(message, chat_id)
+    except Exception as e:
+        logging.error(f"Error in /tasks command: {str(e)}")
+        await send_notification(f"😿 Error in /tasks command: {str(e)} 💔", chat_id)
+
 async def ping_command(chat_id):
     """Checks if the bot is running."""
     try:
@@ -696,14 +1050,15 @@ async def handle_telegram_updates():
         return
     while True:
         try:
-            url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates"
+            url = f"{TELEGRAM_API}/bot{TELEGRAM_BOT_TOKEN}/getUpdates"
             params = {"offset": telegram_offset + 1, "timeout": 30}
-            response = session.get(url, params=params)
+            # Long poll in a worker thread so the event loop keeps scanning and monitoring meanwhile
+            response = await asyncio.to_thread(session.get, url, params=params)
             if response.status_code != 200:
                 logging.error(f"Telegram getUpdates failed: {response.status_code} - {response.text}")
                 await asyncio.sleep(5)
                 continue
-            data = response.json()
+            data = json_loads(response.content)
             if not data.get("ok"):
                 logging.error(f"Telegram getUpdates error: {data}")
                 await asyncio.sleep(5)
@@ -742,6 +1097,10 @@ async def handle_telegram_updates():
                     autopaper_command(chat_id, args)
                 elif command == "export":
                     await export_command(chat_id)
+                elif command == "profile":
+                    await profile_command(chat_id, args)
+                elif command == "tasks":
+                    await tasks_command(chat_id)
                 elif command == "ping":
                     await ping_command(chat_id)
                 else:
@@ -762,6 +1121,38 @@ async def health_check():
     except Exception as e:
         logging.error(f"Health check error: {str(e)}")
 
+def track_task_factory(loop, coro, **kwargs):
+    """Task factory that records each task's creation time for /tasks."""
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    task_started[task] = time.monotonic()
+    return task
+
+def loop_stall_monitor(loop_thread_id):
+    """Watchdog thread that logs the event loop thread's stack while the loop is stalled."""
+    reported = None
+    while True:
+        time.sleep(LOOP_LAG_INTERVAL)
+        heartbeat = loop_heartbeat
+        stalled = time.monotonic() - heartbeat - LOOP_LAG_INTERVAL
+        if stalled > LOOP_LAG_THRESHOLD and heartbeat != reported:
+            reported = heartbeat
+            frame = sys._current_frames().get(loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "unavailable"
+            logging.warning(f"Event loop stalled for {stalled:.2f}s, loop thread stack:\n{stack}")
+
+async def loop_lag_watchdog():
+    """Measures event-loop lag continuously; a helper thread dumps the stack of whatever is hogging the loop."""
+    global loop_heartbeat, loop_lag, loop_lag_max
+    loop_heartbeat = time.monotonic()
+    threading.Thread(target=loop_stall_monitor, args=(threading.get_ident(),), name="loop-watchdog", daemon=True).start()
+    while True:
+        loop_heartbeat = time.monotonic()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        loop_lag = max(time.monotonic() - loop_heartbeat - LOOP_LAG_INTERVAL, 0)
+        loop_lag_max = max(loop_lag_max, loop_lag)
+        if loop_lag > LOOP_LAG_THRESHOLD:
+            logging.warning(f"Event loop lag {loop_lag:.2f}s exceeded {LOOP_LAG_THRESHOLD}s")
+
 async def handle_callback(request):
     """Handles Shyft API callbacks."""
     try:
@@ -791,15 +1182,324 @@ async def start_server():
         logging.error(f"Failed to start HTTP server: {str(e)}")
         await send_notification(f"😿 HTTP server failed to start! {str(e)} 💔. If no incoming HTTP traffic is needed, change to Background Worker in Render settings: https://render.com/docs/background-workers")
 
+async def fetch_token_profiles(notify=True):
+    """Fetches the latest Solana token profiles as mint addresses, cached for 60 seconds."""
+    tokens = []
+    cache_key = DEXSCREENER_TOKEN_API
+    cached_data, cached_time = api_cache.get(cache_key, (None, 0))
+    if cached_data and datetime.now().timestamp() - cached_time < 60:
+        return cached_data
+    for attempt in range(3):
+        try:
+            response = session.get(DEXSCREENER_TOKEN_API)
+            if response.status_code == 200:
+                try:
+                    tokens = decode_token_profiles(response.content)
+                    if tokens is None:
+                        logging.error(f"DexScreener Token API invalid response: {response.text}")
+                        tokens = []
+                        continue
+                    api_cache[cache_key] = (tokens, datetime.now().timestamp())
+                    break
+                except json.JSONDecodeError as e:
+                    logging.error(f"DexScreener Token API JSON decode error: {str(e)}")
+                    continue
+            if notify:
+                await send_notification(f"😿 DexScreener Token API failed! Status {response.status_code}, attempt {attempt+1}/3 💔")
+            logging.error(f"DexScreener Token API failed: {response.status_code} - {response.text}")
+        except Exception as e:
+            if notify:
+                await send_notification(f"😿 DexScreener Token API error! {str(e)}, attempt {attempt+1}/3 💔")
+            logging.error(f"DexScreener Token API exception: {str(e)}")
+        await asyncio.sleep(2)
+    return tokens
+
+async def buy_candidate(token_address, market_cap, buy_price, liquidity):
+    """Buys a screened candidate once and starts monitoring it; returns False, leaving the mint unclaimed, at the daily trade limit."""
+    # Check-and-claim runs without an await, so concurrent feeds can never double-buy
+    if token_address in processed_tokens:
+        return True
+    if trade_count >= MAX_TRADES_PER_DAY and datetime.now().date() == last_trade_day:
+        logging.info(f"Skipping {token_address}: max trades per day reached")
+        return False
+    logging.info(f"Found {token_address}: ${market_cap}, liquidity ${liquidity}")
+    processed_tokens.add(token_address)
+    success = await execute_trade(token_address, buy=True, paper=auto_paper)
+    if success:
+        asyncio.create_task(monitor_price(token_address, buy_price, market_cap, paper=auto_paper))
+    return True
+
+async def process_candidate(token_address):
+    """Screens a candidate mint and, if it passes, buys it and starts monitoring; returns False if it failed screening or was deferred."""
+    if not token_address or token_address in processed_tokens:
+        return True
+    if token_address in screening_tokens:
+        return False
+    screening_tokens.add(token_address)
+    try:
+        for attempt in range(3):
+            try:
+                market_cap, buy_price, liquidity = await check_token(token_address)
+                if market_cap:
+                    return await buy_candidate(token_address, market_cap, buy_price, liquidity)
+                return False
+            except Exception as e:
+                logging.error(f"Token validation error for {token_address}: {str(e)}")
+            await asyncio.sleep(2)
+        return False
+    finally:
+        screening_tokens.discard(token_address)
+
+def decode_ray_init_log(logs):
+    """Decodes Raydium's initialize2 ray_log into (open_time, pc_decimals, coin_decimals, pc_amount, coin_amount)."""
+    for line in logs:
+        if "ray_log:" not in line:
+            continue
+        try:
+            raw = base64.b64decode(line.split("ray_log:", 1)[1].strip())
+        except ValueError:
+            continue
+        # InitLog: log_type u8 (0), time u64, pc_decimals u8, coin_decimals u8, pc/coin lot sizes u64, pc/coin amounts u64, market
+        if len(raw) >= 75 and raw[0] == 0:
+            _, open_time, pc_decimals, coin_decimals, _, _, pc_amount, coin_amount = struct.unpack_from("<BQBBQQQQ", raw)
+            return open_time, pc_decimals, coin_decimals, pc_amount, coin_amount
+    return None
+
+async def rpc_request(http, method, params):
+    """Sends a raw JSON-RPC request to SOLANA_RPC and returns its result."""
+    async with http.post(SOLANA_RPC, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params}, timeout=aiohttp.ClientTimeout(total=10)) as response:
+        payload = await response.json(content_type=None)
+        if "error" in payload:
+            raise ValueError(payload["error"])
+        return payload.get("result")
+
+async def handle_new_pool(http, signature, logs):
+    """Decodes a new Raydium pool's mints and initial liquidity and queues SOL pairs for screening."""
+    try:
+        init = decode_ray_init_log(logs)
+        if not init:
+            return
+        open_time, pc_decimals, coin_decimals, pc_amount, coin_amount = init
+        tx = None
+        for _ in range(3):
+            tx = await rpc_request(http, "getTransaction", [signature, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0, "commitment": "confirmed"}])
+            if tx:
+                break
+            await asyncio.sleep(1)
+        if not tx:
+            logging.warning(f"New pool transaction {signature} not available")
+            return
+        instructions = list(tx["transaction"]["message"]["instructions"])
+        for inner in (tx.get("meta") or {}).get("innerInstructions") or []:
+            instructions.extend(inner.get("instructions", []))
+        # initialize2 accounts: 8 = coin mint, 9 = pc mint
+        accounts = next((ix["accounts"] for ix in instructions if ix.get("programId") == RAYDIUM_AMM_PROGRAM and len(ix.get("accounts", [])) >= 18), None)
+        if not accounts:
+            return
+        coin_mint, pc_mint = accounts[8], accounts[9]
+        if pc_mint == WSOL_MINT:
+            token_address, sol_liquidity = coin_mint, pc_amount / 10 ** pc_decimals
+        elif coin_mint == WSOL_MINT:
+            token_address, sol_liquidity = pc_mint, coin_amount / 10 ** coin_decimals
+        else:
+            return
+        if sol_liquidity < DISCOVERY_MIN_SOL_LIQUIDITY:
+            logging.info(f"New pool {token_address} skipped: {sol_liquidity:.1f} SOL initial liquidity")
+            return
+        if token_address in processed_tokens:
+            return
+        logging.info(f"New pool discovered: {token_address} with {sol_liquidity:.1f} SOL, opens {datetime.fromtimestamp(open_time)}")
+        await discovery_queue.put((token_address, open_time))
+    except Exception as e:
+        logging.error(f"New pool decode error for {signature}: {str(e)}")
+
+async def discover_new_pools():
+    """Watches Raydium AMM program logs over the RPC WebSocket for pool initializations."""
+    backoff = 1
+    while True:
+        try:
+            async with aiohttp.ClientSession() as http:
+                async with http.ws_connect(SOLANA_WS, heartbeat=30) as ws:
+                    await ws.send_json({"jsonrpc": "2.0", "id": 1, "method": "logsSubscribe", "params": [{"mentions": [RAYDIUM_AMM_PROGRAM]}, {"commitment": "confirmed"}]})
+                    logging.info(f"Subscribed to Raydium pool logs on {SOLANA_WS}")
+                    backoff = 1
+                    async for message in ws:
+                        if message.type != aiohttp.WSMsgType.TEXT:
+                            if message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+                            continue
+                        value = json_loads(message.data).get("params", {}).get("result", {}).get("value", {})
+                        logs = value.get("logs") or []
+                        if value.get("err") is None and any("initialize2" in line for line in logs):
+                            asyncio.create_task(handle_new_pool(http, value.get("signature"), logs))
+        except Exception as e:
+            logging.error(f"Pool discovery stream error: {str(e)}")
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 60)
+
+async def screen_discovered_pool(token_address, open_time, screen=process_candidate):
+    """Waits until a discovered pool is safely past the entry age filter, then screens it, retrying failures with backoff for a while."""
+    wait = open_time + ENTRY_POOL_AGE_MIN + DISCOVERY_AGE_MARGIN - datetime.now().timestamp()
+    if wait > MAX_TOKEN_AGE:
+        logging.info(f"New pool {token_address} skipped: opens too far in the future")
+        return
+    if wait > 0:
+        await asyncio.sleep(wait)
+    deadline = datetime.now().timestamp() + DISCOVERY_RETRY_WINDOW
+    backoff = DISCOVERY_AGE_MARGIN
+    while True:
+        if trade_count >= MAX_TRADES_PER_DAY and datetime.now().date() == last_trade_day:
+            return
+        if await screen(token_address):
+            return
+        if datetime.now().timestamp() + backoff > deadline:
+            logging.info(f"New pool {token_address} dropped: still failing screening after {DISCOVERY_RETRY_WINDOW}s")
+            return
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, DISCOVERY_RETRY_MAX)
+
+async def discovery_consumer():
+    """Feeds discovered pools into the same screening path as token profiles."""
+    while True:
+        token_address, open_time = await discovery_queue.get()
+        if token_address in processed_tokens:
+            continue
+        if shard_inboxes:
+            # Screened by the scan worker owning the mint's shard, like profile candidates
+            shard_inboxes[shard_of(token_address, len(shard_inboxes))].put(("pool", token_address, open_time))
+        else:
+            asyncio.create_task(screen_discovered_pool(token_address, open_time))
+
+def shard_of(token_address, shards):
+    """Stable shard index for a mint (Python's str hash differs between processes)."""
+    return zlib.crc32(token_address.encode()) % shards
+
+def bridge_queue(source):
+    """Feeds a multiprocessing queue into an asyncio.Queue from a dedicated daemon thread, leaving the default executor free."""
+    loop = asyncio.get_running_loop()
+    target = asyncio.Queue()
+
+    def pump():
+        while True:
+            item = source.get()
+            try:
+                loop.call_soon_threadsafe(target.put_nowait, item)
+            except RuntimeError:
+                return  # Event loop closed
+
+    threading.Thread(target=pump, name="queue-bridge", daemon=True).start()
+    return target
+
+async def scan_shard(index, shards, candidates, inbox, shared_loss_streak):
+    """Screens the profile and discovered-pool mints in this worker's shard, sending passing ones to the coordinator."""
+    forwarded = set()
+    forwarded_day = datetime.now().date()
+
+    async def screen(token_address):
+        global loss_streak
+        if token_address in forwarded:
+            return True
+        loss_streak = shared_loss_streak.value
+        try:
+            market_cap, _, _ = await check_token(token_address)
+        except Exception as e:
+            logging.error(f"Token validation error for {token_address}: {str(e)}")
+            return False
+        if not market_cap:
+            return False
+        forwarded.add(token_address)
+        snapshot = api_cache.get(f"{DEXSCREENER_PAIRS_API}/{token_address}", (None, 0))[0]
+        candidates.put((token_address, snapshot, datetime.now().timestamp()))
+        return True
+
+    async def read_inbox():
+        messages = bridge_queue(inbox)
+        while True:
+            kind, token_address, open_time = await messages.get()
+            if kind == "skipped":
+                # The coordinator could not take it yet; screen it again on the next pass
+                forwarded.discard(token_address)
+            else:
+                asyncio.create_task(screen_discovered_pool(token_address, open_time, screen))
+
+    asyncio.create_task(read_inbox())
+    logging.info(f"Scan worker {index + 1}/{shards} started")
+    while True:
+        if datetime.now().date() != forwarded_day:
+            forwarded.clear()
+            forwarded_day = datetime.now().date()
+        for token_address in await fetch_token_profiles(notify=False):
+            if shard_of(token_address, shards) == index:
+                await screen(token_address)
+        await asyncio.sleep(DATA_POLL_INTERVAL)
+
+def scan_worker(index, shards, candidates, inbox, shared_loss_streak):
+    """Entry point of a scanner/screener process."""
+    try:
+        asyncio.run(scan_shard(index, shards, candidates, inbox, shared_loss_streak))
+    except KeyboardInterrupt:
+        pass
+
+def start_scan_worker(context, index, candidates, shared_loss_streak):
+    process = context.Process(target=scan_worker, args=(index, SCAN_WORKERS, candidates, shard_inboxes[index], shared_loss_streak), name=f"scan-worker-{index}", daemon=True)
+    process.start()
+    return process
+
+async def coordinate_scan_workers():
+    """Single trade coordinator: owns the wallet, positions and daily limit, buying candidates from the scan workers."""
+    context = multiprocessing.get_context("spawn")
+    candidates = context.Queue()
+    shared_loss_streak = context.Value("i", loss_streak)
+    shard_inboxes[:] = [context.Queue() for _ in range(SCAN_WORKERS)]
+    workers = [start_scan_worker(context, index, candidates, shared_loss_streak) for index in range(SCAN_WORKERS)]
+    logging.info(f"Started {SCAN_WORKERS} scan workers")
+    ready = bridge_queue(candidates)
+    while True:
+        for index, process in enumerate(workers):
+            if not process.is_alive():
+                logging.error(f"Scan worker {index + 1} exited with code {process.exitcode}, restarting")
+                workers[index] = start_scan_worker(context, index, candidates, shared_loss_streak)
+        shared_loss_streak.value = loss_streak
+        try:
+            token_address, snapshot, screened_at = await asyncio.wait_for(ready.get(), 1)
+        except asyncio.TimeoutError:
+            continue
+        if token_address in processed_tokens:
+            continue
+        if token_address in screening_tokens:
+            taken = False  # Being screened in-process right now
+        elif snapshot is None:
+            taken = await process_candidate(token_address)
+        else:
+            # Seed the caches with the worker's screening so execute_trade's recheck does not refetch
+            api_cache[f"{DEXSCREENER_PAIRS_API}/{token_address}"] = (snapshot, screened_at)
+            api_cache[f"shyft_{token_address}"] = (False, screened_at)
+            taken = await buy_candidate(token_address, snapshot.market_cap, snapshot.price, snapshot.liquidity)
+        if not taken:
+            # Hand it back so the owning worker offers it again on a later pass, as in-process scanning would
+            shard_inboxes[shard_of(token_address, SCAN_WORKERS)].put(("skipped", token_address, None))
+
 async def main():
     """Main bot loop for scanning and trading Solana tokens."""
     global trade_count, last_trade_day, processed_tokens, paper_trading
     if BACKTEST_MODE:
         await backtest_command(TELEGRAM_CHAT_ID)
         return
+    loop = asyncio.get_running_loop()
+    loop.set_task_factory(track_task_factory)
+    if LOOP_DEBUG:
+        # asyncio logs "Executing <Task ...> took N seconds" for every callback slower than this
+        loop.set_debug(True)
+        loop.slow_callback_duration = LOOP_LAG_THRESHOLD
+    asyncio.create_task(loop_lag_watchdog())
     asyncio.create_task(handle_telegram_updates())
     asyncio.create_task(health_check())
     asyncio.create_task(start_server())
+    if POOL_DISCOVERY:
+        asyncio.create_task(discover_new_pools())
+        asyncio.create_task(discovery_consumer())
+    if SCAN_WORKERS > 0:
+        asyncio.create_task(coordinate_scan_workers())
     await send_notification("💃 Dopamine Memecoin Sniper Bot v3.12 is LIVE! Scanning Solana for 1000x MOONSHOTS! 🌟😘")
     while True:
         if trade_count >= MAX_TRADES_PER_DAY and datetime.now().date() == last_trade_day:
@@ -809,55 +1509,17 @@ async def main():
             processed_tokens.clear()
             logging.info("Reset trade count and processed tokens for new day")
             continue
-        tokens = []
-        cache_key = DEXSCREENER_TOKEN_API
-        cached_data, cached_time = api_cache.get(cache_key, (None, 0))
-        if cached_data and datetime.now().timestamp() - cached_time < 60:
-            tokens = cached_data
-        else:
-            for attempt in range(3):
-                try:
-                    response = session.get(DEXSCREENER_TOKEN_API)
-                    if response.status_code == 200:
-                        try:
-                            data = response.json()
-                            if data is None or not isinstance(data, list) or not data:
-                                logging.error(f"DexScreener Token API invalid response: {response.text}")
-                                continue
-                            tokens = [token for token in data if token.get("chainId") == "solana" and token.get("tokenAddress")]
-                            api_cache[cache_key] = (tokens, datetime.now().timestamp())
-                            break
-                        except json.JSONDecodeError as e:
-                            logging.error(f"DexScreener Token API JSON decode error: {str(e)}")
-                            continue
-                    await send_notification(f"😿 DexScreener Token API failed! Status {response.status_code}, attempt {attempt+1}/3 💔")
-                    logging.error(f"DexScreener Token API failed: {response.status_code} - {response.text}")
-                except Exception as e:
-                    await send_notification(f"😿 DexScreener Token API error! {str(e)}, attempt {attempt+1}/3 💔")
-                    logging.error(f"DexScreener Token API exception: {str(e)}")
-                await asyncio.sleep(2)
+        if SCAN_WORKERS > 0:
+            # Scan workers screen profiles; this loop only keeps the daily reset running
+            await asyncio.sleep(DATA_POLL_INTERVAL)
+            continue
+        tokens = await fetch_token_profiles()
         if not tokens:
             logging.warning("No Solana tokens found in DexScreener Token API, skipping this scan")
             await asyncio.sleep(DATA_POLL_INTERVAL)
             continue
         for token in tokens:
-            token_address = token.get("tokenAddress")
-            if not token_address or token_address in processed_tokens:
-                continue
-            for attempt in range(3):
-                try:
-                    market_cap, buy_price, liquidity = await check_token(token_address)
-                    if market_cap:
-                        logging.info(f"Found {token_address}: ${market_cap}, liquidity ${liquidity}")
-                        processed_tokens.add(token_address)
-                        success = await execute_trade(token_address, buy=True, paper=auto_paper)
-                        if success:
-                            asyncio.create_task(monitor_price(token_address, buy_price, market_cap, paper=auto_paper))
-                        break
-                    break
-                except Exception as e:
-                    logging.error(f"Token validation error for {token_address}: {str(e)}")
-                await asyncio.sleep(2)
+            await process_candidate(token)
         await asyncio.sleep(DATA_POLL_INTERVAL)
 
 if __name__ == "__main__":
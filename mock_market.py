@@ -0,0 +1,401 @@
+"""Local mock market for load-testing the Dopamine Memecoin Sniper Bot.
+
+Serves the DexScreener, Shyft, Jupiter, Telegram and Solana RPC (HTTP and
+logsSubscribe WebSocket) endpoints the bot calls, backed by synthetic token
+launches, random-walk price paths and rugs, with configurable latency and
+error injection. Point the bot at it with:
+
+    DEXSCREENER_TOKEN_API=http://127.0.0.1:9000/token-profiles/latest/v1
+    DEXSCREENER_PAIRS_API=http://127.0.0.1:9000/latest/dex/pairs/solana
+    SHYFT_API=http://127.0.0.1:9000/sol/v1/token
+    TELEGRAM_API=http://127.0.0.1:9000
+    JUPITER_PRICE_API=http://127.0.0.1:9000/price/v2
+    SOLANA_RPC=http://127.0.0.1:9000/rpc
+    DATA_DIR=/tmp/sniper-data
+"""
+import argparse
+import asyncio
+import base64
+import logging
+import math
+import random
+import struct
+import time
+from collections import Counter
+from aiohttp import WSMsgType, web
+from solders.pubkey import Pubkey
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+BLOCKHASH = "11111111111111111111111111111111"
+RAYDIUM_AMM_PROGRAM = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
+SOL_USD = 150  # Quote rate behind priceNative and pool reserves
+ENTRY_MC_MIN = 75000  # Mirrors the bot's entry filters so passing tokens actually pass
+ENTRY_MC_MAX = 2000000
+
+class SyntheticToken:
+    """One synthetic launch with a geometric random-walk price path."""
+    __slots__ = ("mint", "created_at", "price", "supply", "lp_ratio", "volatility", "drift", "rug_at", "passing", "last_tick")
+
+    def __init__(self, mint, created_at, price, supply, lp_ratio, volatility, drift, rug_at, passing):
+        self.mint = mint
+        self.created_at = created_at
+        self.price = price
+        self.supply = supply
+        self.lp_ratio = lp_ratio
+        self.volatility = volatility
+        self.drift = drift
+        self.rug_at = rug_at
+        self.passing = passing
+        self.last_tick = created_at
+
+    def rugged(self, now):
+        return self.rug_at is not None and now >= self.rug_at
+
+class SyntheticMarket:
+    """Generates launches, price paths and rugs at configurable rates."""
+
+    def __init__(self, launch_rate=60, pass_rate=0.2, rug_rate=0.1, volatility=0.05, profile_batch=30, max_tokens=100000, seed=None):
+        self.launch_rate = launch_rate  # launches per minute
+        self.pass_rate = pass_rate
+        self.rug_rate = rug_rate
+        self.volatility = volatility  # per-minute log-price stddev
+        self.profile_batch = profile_batch
+        self.max_tokens = max_tokens
+        self.rng = random.Random(seed)
+        self.tokens = {}
+        self.recent = []
+        self.launched = 0
+        self.rugs = 0
+        self.last_launch = time.time()
+        self.pending_launches = 0.0
+        self.listeners = []  # asyncio.Queues fed every new launch, for logsSubscribe streams
+        self.pool_transactions = {}  # signature: mint
+
+    def new_mint(self):
+        return str(Pubkey.from_bytes(bytes(self.rng.getrandbits(8) for _ in range(32))))
+
+    def launch(self, now=None):
+        """Creates the launches due since the last call."""
+        now = now or time.time()
+        self.pending_launches += (now - self.last_launch) * self.launch_rate / 60
+        self.last_launch = now
+        while self.pending_launches >= 1:
+            self.pending_launches -= 1
+            self.add_token(now)
+
+    def add_token(self, now):
+        passing = self.rng.random() < self.pass_rate
+        if passing:
+            market_cap = self.rng.uniform(ENTRY_MC_MIN * 1.2, ENTRY_MC_MAX * 0.8)
+        else:
+            market_cap = self.rng.choice([self.rng.uniform(5000, ENTRY_MC_MIN * 0.9), self.rng.uniform(ENTRY_MC_MAX * 1.1, ENTRY_MC_MAX * 10)])
+        supply = 1_000_000_000
+        rug_at = now + self.rng.expovariate(1 / 600) if self.rng.random() < self.rug_rate else None
+        token = SyntheticToken(
+            mint=self.new_mint(),
+            created_at=now - self.rng.uniform(120, 3600),  # Profiles appear after the pool opened
+            price=market_cap / supply,
+            supply=supply,
+            lp_ratio=max(self.rng.uniform(0.2, 0.5), 35000 / market_cap),
+            volatility=self.volatility * self.rng.uniform(0.5, 2),
+            drift=self.rng.uniform(-0.01, 0.02),
+            rug_at=rug_at,
+            passing=passing,
+        )
+        token.last_tick = now
+        self.tokens[token.mint] = token
+        self.recent.append(token.mint)
+        self.launched += 1
+        if len(self.recent) > self.profile_batch:
+            del self.recent[:-self.profile_batch]
+        if len(self.tokens) > self.max_tokens:
+            self.tokens.pop(next(iter(self.tokens)))
+        for listener in self.listeners:
+            listener.put_nowait(token)
+        return token
+
+    def tick(self, token, now=None):
+        """Advances a token's price path to now."""
+        now = now or time.time()
+        minutes = max(now - token.last_tick, 0) / 60
+        if minutes > 0:
+            shock = self.rng.gauss(0, 1) * token.volatility * math.sqrt(minutes)
+            token.price *= math.exp(token.drift * minutes + shock)
+            token.last_tick = now
+        if token.rugged(now) and token.lp_ratio > 0.01:
+            token.price *= 0.02
+            token.lp_ratio = 0.005
+            self.rugs += 1
+        return token.price
+
+    def profiles(self):
+        self.launch()
+        return [{"chainId": "solana", "tokenAddress": mint, "url": f"https://dexscreener.com/solana/{mint}"} for mint in reversed(self.recent)]
+
+    def pair(self, mint):
+        token = self.tokens.get(mint)
+        if token is None:
+            return {"schemaVersion": "1.0.0", "pair": None}
+        now = time.time()
+        price = self.tick(token, now)
+        market_cap = price * token.supply
+        return {
+            "schemaVersion": "1.0.0",
+            "pair": {
+                "chainId": "solana",
+                "dexId": "raydium",
+                "pairAddress": mint,
+                "baseToken": {"address": mint, "symbol": mint[:4].upper()},
+                "quoteToken": {"address": SOL_MINT, "symbol": "SOL"},
+                "priceNative": f"{price / SOL_USD:.12f}",
+                "priceUsd": f"{price:.12f}",
+                "marketCap": market_cap,
+                "fdv": market_cap,
+                "liquidity": {"usd": market_cap * token.lp_ratio},
+                "volume": {"h1": self.rng.uniform(20000, 200000) if token.passing else self.rng.uniform(0, 20000)},
+                "priceChange": {"m5": self.rng.uniform(-0.04, 0.04), "h1": self.rng.uniform(40, 300) if token.passing else self.rng.uniform(-50, 20)},
+                "pairCreatedAt": int(token.created_at * 1000),
+                "createdAt": int(token.created_at * 1000),
+            },
+        }
+
+    def pool_logs(self, token):
+        """Raydium initialize2 program logs for a launch, with a ray_log InitLog carrying the initial reserves."""
+        signature = str(Pubkey.from_bytes(bytes(self.rng.getrandbits(8) for _ in range(32)))) * 2
+        self.pool_transactions[signature] = token.mint
+        if len(self.pool_transactions) > self.max_tokens:
+            self.pool_transactions.pop(next(iter(self.pool_transactions)))
+        side_usd = token.price * token.supply * token.lp_ratio / 2
+        init_log = struct.pack("<BQBBQQQQ32s", 0, int(token.created_at), 9, 6, 1, 1, int(side_usd / SOL_USD * 1e9), int(side_usd / token.price * 1e6), bytes(32))
+        logs = [
+            f"Program {RAYDIUM_AMM_PROGRAM} invoke [1]",
+            "Program log: initialize2: InitializeInstruction2 { nonce: 254, open_time: 0, init_pc_amount: 0, init_coin_amount: 0 }",
+            f"Program log: ray_log: {base64.b64encode(init_log).decode()}",
+            f"Program {RAYDIUM_AMM_PROGRAM} success",
+        ]
+        return signature, logs
+
+    def pool_transaction(self, signature):
+        """jsonParsed getTransaction result with the initialize2 account list (8 = coin mint, 9 = pc mint)."""
+        mint = self.pool_transactions.get(signature)
+        if mint is None:
+            return None
+        accounts = [BLOCKHASH] * 18
+        accounts[4] = mint
+        accounts[8] = mint
+        accounts[9] = SOL_MINT
+        return {
+            "slot": 1,
+            "blockTime": int(time.time()),
+            "meta": {"err": None, "innerInstructions": []},
+            "transaction": {"signatures": [signature], "message": {"instructions": [{"programId": RAYDIUM_AMM_PROGRAM, "accounts": accounts, "data": ""}]}},
+        }
+
+    def jupiter_price(self, mints):
+        data = {}
+        for mint in mints:
+            token = self.tokens.get(mint)
+            if token is not None:
+                data[mint] = {"id": mint, "type": "derivedPrice", "price": f"{self.tick(token):.12f}"}
+        return {"data": data, "timeTaken": 0.001}
+
+    def shyft(self, mint):
+        token = self.tokens.get(mint)
+        if token is None:
+            return {"success": False, "message": "Token not found", "result": {}}
+        rugged = token.rugged(time.time())
+        return {"success": True, "result": {"address": mint, "is_suspicious": rugged, "liquidity_locked": not rugged}}
+
+class MockMarketServer:
+    """aiohttp app serving the synthetic market with latency and error injection."""
+
+    def __init__(self, market, latency_ms=0, jitter_ms=0, error_rate=0.0, telegram_poll=1.0):
+        self.market = market
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.telegram_poll = telegram_poll
+        self.requests = Counter()
+        self.errors = Counter()
+        self.messages = []
+        self.started = time.time()
+
+    def app(self):
+        app = web.Application(middlewares=[self.inject_faults])
+        app.add_routes([
+            web.get("/token-profiles/latest/v1", self.handle_profiles),
+            web.get("/latest/dex/pairs/solana/{mint}", self.handle_pair),
+            web.get("/sol/v1/token/{mint}", self.handle_shyft),
+            web.get("/price/v2", self.handle_jupiter_price),
+            web.get("/bot{token}/getUpdates", self.handle_get_updates),
+            web.post("/bot{token}/sendMessage", self.handle_send_message),
+            web.post("/rpc", self.handle_rpc),
+            web.get("/rpc", self.handle_rpc_ws),
+            web.get("/stats", self.handle_stats),
+        ])
+        return app
+
+    @web.middleware
+    async def inject_faults(self, request, handler):
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests[route] += 1
+        if route == "/stats":
+            return await handler(request)
+        if self.latency_ms or self.jitter_ms:
+            await asyncio.sleep((self.latency_ms + self.market.rng.uniform(0, self.jitter_ms)) / 1000)
+        if self.error_rate and self.market.rng.random() < self.error_rate:
+            self.errors[route] += 1
+            status = self.market.rng.choice([429, 500, 502, 503])
+            return web.Response(status=status, text=f"Injected error {status}")
+        return await handler(request)
+
+    async def handle_profiles(self, request):
+        return web.json_response(self.market.profiles())
+
+    async def handle_pair(self, request):
+        return web.json_response(self.market.pair(request.match_info["mint"]))
+
+    async def handle_shyft(self, request):
+        return web.json_response(self.market.shyft(request.match_info["mint"]))
+
+    async def handle_jupiter_price(self, request):
+        return web.json_response(self.market.jupiter_price(request.query.get("ids", "").split(",")))
+
+    async def handle_get_updates(self, request):
+        timeout = float(request.query.get("timeout", 0))
+        await asyncio.sleep(min(timeout, self.telegram_poll))
+        return web.json_response({"ok": True, "result": []})
+
+    async def handle_send_message(self, request):
+        payload = await request.json()
+        self.messages.append(payload.get("text", ""))
+        del self.messages[:-100]
+        return web.json_response({"ok": True, "result": {"message_id": len(self.messages), "text": payload.get("text", "")}})
+
+    async def handle_rpc(self, request):
+        payload = await request.json()
+        if isinstance(payload, list):
+            return web.json_response([self.rpc_result(call) for call in payload])
+        return web.json_response(self.rpc_result(payload))
+
+    async def handle_rpc_ws(self, request):
+        """RPC WebSocket supporting logsSubscribe: streams an initialize2 notification for every launch."""
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        subscribed = asyncio.Event()
+        subscription = 0
+
+        async def read():
+            nonlocal subscription
+            async for message in ws:
+                if message.type == WSMsgType.TEXT:
+                    call = message.json()
+                    if call.get("method") == "logsSubscribe":
+                        subscription += 1
+                        await ws.send_json({"jsonrpc": "2.0", "id": call.get("id"), "result": subscription})
+                        subscribed.set()
+
+        reader = asyncio.create_task(read())
+        launches = asyncio.Queue()
+        try:
+            await subscribed.wait()
+            self.market.listeners.append(launches)
+            while not ws.closed:
+                try:
+                    token = await asyncio.wait_for(launches.get(), 0.2)
+                except asyncio.TimeoutError:
+                    self.market.launch()
+                    continue
+                signature, logs = self.market.pool_logs(token)
+                self.requests["logsNotification"] += 1
+                await ws.send_json({
+                    "jsonrpc": "2.0",
+                    "method": "logsNotification",
+                    "params": {"subscription": subscription, "result": {"context": {"slot": 1}, "value": {"signature": signature, "err": None, "logs": logs}}},
+                })
+        finally:
+            if launches in self.market.listeners:
+                self.market.listeners.remove(launches)
+            reader.cancel()
+        return ws
+
+    def rpc_result(self, call):
+        method = call.get("method")
+        context = {"slot": int(time.time() - self.started) + 1}
+        if method == "getBalance":
+            result = {"context": context, "value": 2_000_000_000}
+        elif method == "getLatestBlockhash":
+            result = {"context": context, "value": {"blockhash": BLOCKHASH, "lastValidBlockHeight": context["slot"] + 150}}
+        elif method == "getAccountInfo":
+            result = {"context": context, "value": None}
+        elif method == "getTransaction":
+            result = self.market.pool_transaction(call.get("params", [None])[0])
+        elif method == "sendTransaction":
+            result = "1" * 88
+        else:
+            return {"jsonrpc": "2.0", "id": call.get("id"), "error": {"code": -32601, "message": f"Method not found: {method}"}}
+        return {"jsonrpc": "2.0", "id": call.get("id"), "result": result}
+
+    def stats(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        return {
+            "elapsed_seconds": round(elapsed, 1),
+            "tokens_launched": self.market.launched,
+            "tokens_live": len(self.market.tokens),
+            "rugs": self.market.rugs,
+            "requests": dict(self.requests),
+            "requests_per_second": {route: round(count / elapsed, 2) for route, count in self.requests.items()},
+            "injected_errors": dict(self.errors),
+            "telegram_messages": len(self.messages),
+        }
+
+    async def handle_stats(self, request):
+        return web.json_response(self.stats())
+
+    async def report(self, interval):
+        """Logs request throughput per endpoint every interval seconds."""
+        previous = Counter()
+        while True:
+            await asyncio.sleep(interval)
+            delta = self.requests - previous
+            previous = Counter(self.requests)
+            rates = ", ".join(f"{route}={count / interval:.1f}/s" for route, count in delta.most_common())
+            logging.info(f"Launched {self.market.launched} tokens, {self.market.rugs} rugs; {rates or 'no requests'}")
+
+async def serve(args):
+    market = SyntheticMarket(
+        launch_rate=args.launch_rate,
+        pass_rate=args.pass_rate,
+        rug_rate=args.rug_rate,
+        volatility=args.volatility,
+        profile_batch=args.profile_batch,
+        seed=args.seed,
+    )
+    server = MockMarketServer(market, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, telegram_poll=args.telegram_poll)
+    runner = web.AppRunner(server.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    logging.info(f"Mock market listening on http://{args.host}:{args.port} ({args.launch_rate} launches/min)")
+    await server.report(args.report_interval)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local mock market for load-testing the sniper bot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--launch-rate", type=float, default=60, help="synthetic token launches per minute")
+    parser.add_argument("--pass-rate", type=float, default=0.2, help="fraction of launches that pass the bot's entry filters")
+    parser.add_argument("--rug-rate", type=float, default=0.1, help="fraction of launches that rug")
+    parser.add_argument("--volatility", type=float, default=0.05, help="per-minute log-price volatility")
+    parser.add_argument("--profile-batch", type=int, default=30, help="tokens returned per token-profiles call")
+    parser.add_argument("--latency-ms", type=float, default=0, help="fixed latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="uniform random latency added on top")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429/5xx")
+    parser.add_argument("--telegram-poll", type=float, default=1.0, help="max seconds getUpdates holds the long poll")
+    parser.add_argument("--report-interval", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    asyncio.run(serve(parse_args()))